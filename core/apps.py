@@ -1,5 +1,56 @@
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        if not getattr(settings, "STOCK_CACHE_WARMUP_ON_STARTUP", False):
+            return
+
+        # Only warm up in processes that serve requests: skip one-off
+        # management commands and the runserver autoreloader's parent.
+        if len(sys.argv) > 1 and sys.argv[0].endswith("manage.py"):
+            if sys.argv[1] != "runserver":
+                return
+            if "--noreload" not in sys.argv and os.environ.get("RUN_MAIN") != "true":
+                return
+
+        _start_warmup()
+
+        # A preloading server (e.g. gunicorn --preload) forks its workers from
+        # this process. They don't inherit the warm-up thread, so each one
+        # starts its own.
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_start_warmup_after_fork)
+
+
+def _start_warmup():
+    # core.utils imports pandas, so even the import happens off the
+    # startup path, in the warm-up thread itself.
+    threading.Thread(
+        target=_warm_indicator_cache, name="indicator-cache-warmup", daemon=True
+    ).start()
+
+
+def _start_warmup_after_fork():
+    # core.utils registers its own fork hook, but it runs after this one;
+    # reset its locks first so the new thread can't take an inherited one.
+    utils = sys.modules.get("core.utils")
+    if utils is not None:
+        utils._reset_after_fork()
+    _start_warmup()
+
+
+def _warm_indicator_cache():
+    from .utils import warm_indicator_cache
+
+    # Build on this thread rather than spawning another one: the build lock
+    # it holds makes concurrent cold requests wait for it and /status/
+    # report it as warming.
+    warm_indicator_cache(background=False)
@@ -7,6 +7,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from core.utils import warm_indicator_cache
 
 # List of popular NSE stocks (Top 200+ stocks)
 NSE_STOCKS = [
@@ -74,6 +75,11 @@ class Command(BaseCommand):
             default=None,
             help='Limit the number of stocks to download (for testing)',
         )
+        parser.add_argument(
+            '--skip-warmup',
+            action='store_true',
+            help='Do not precompute the indicator snapshot after downloading',
+        )
 
     def handle(self, *args, **options):
         # Create data directory
@@ -128,3 +134,10 @@ class Command(BaseCommand):
             f'\nDownload complete! Successful: {successful}, Failed: {failed}'
         ))
         self.stdout.write(f'Data saved to: {data_dir}')
+        
+        if successful and not options['skip_warmup']:
+            # Precompute indicators once here so running servers can pick up
+            # the new snapshot from disk instead of recomputing it themselves
+            self.stdout.write('Building indicator snapshot...', ending=' ')
+            indicators = warm_indicator_cache(background=False)
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(indicators)} stocks'))
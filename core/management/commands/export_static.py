@@ -0,0 +1,225 @@
+"""
+Management command to export the screener and stock detail pages as static files
+"""
+import hashlib
+import json
+import math
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+from django.urls import reverse
+from core.utils import get_available_stocks, get_stock_data_dir
+
+# Screener views exported by default: name -> filters (None means show all).
+# The unnamed one is the /screener/ landing page, written to screener/index.html.
+DEFAULT_SCREENS = {
+    '': {},
+    'all': None,
+    'above-ma-200': {'above_ma_200': True},
+    'uptrend': {'above_ma_20': True, 'above_ma_50': True, 'above_ma_200': True},
+    'oversold': {'max_rsi': 30},
+    'overbought': {'min_rsi': 70},
+    'momentum-1m': {'min_pct_1m': 10},
+    'volume-spike': {'min_volume_ratio': 2},
+}
+
+MANIFEST_NAME = 'manifest.json'
+
+def get_file_hash(filepath):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_template_hash(template_name):
+    """Hash of a template's source, so template edits force a re-render"""
+    return get_file_hash(get_template(template_name).origin.name)
+
+def write_file(filepath, content):
+    """Write atomically so a CDN or nginx never serves a half-written file"""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, filepath)
+
+def to_json(data):
+    """Serialize for browsers: NaN/inf (which pandas produces) become null"""
+    def clean(value):
+        if isinstance(value, dict):
+            return {key: clean(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [clean(item) for item in value]
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+    return json.dumps(clean(data), default=float, allow_nan=False)
+
+def _init_worker():
+    # Worker processes may be spawned rather than forked (e.g. on macOS)
+    django.setup()
+
+def export_stock(symbol, output_dir):
+    """Render stock/<symbol>/index.html and index.json; returns the symbol"""
+    from core.views import get_stock_detail_context
+
+    context = get_stock_detail_context(symbol)
+    page_dir = os.path.join(output_dir, 'stock', symbol)
+    write_file(
+        os.path.join(page_dir, 'index.html'),
+        render_to_string('core/stock_detail.html', context),
+    )
+    write_file(
+        os.path.join(page_dir, 'index.json'),
+        to_json({
+            'symbol': context['symbol'],
+            'indicators': context.get('indicators'),
+            'chart_data': context.get('chart_data', []),
+        }),
+    )
+    return symbol
+
+def export_screen(name, filters, output_dir):
+    """Render screener/<name>/index.html and index.json; returns the name"""
+    from core.views import get_screener_context
+
+    context = get_screener_context(filters, show_all=filters is None)
+    # Point "Show all" at the exported page instead of a query string
+    context['show_all_url'] = reverse('screener') + 'all/'
+    page_dir = os.path.join(output_dir, 'screener', name)
+    write_file(
+        os.path.join(page_dir, 'index.html'),
+        render_to_string('core/screener.html', context),
+    )
+    write_file(
+        os.path.join(page_dir, 'index.json'),
+        to_json({
+            'filters': filters or {},
+            'results_count': context['results_count'],
+            'results': context['results'],
+        }),
+    )
+    return name
+
+class Command(BaseCommand):
+    help = 'Pre-render stock detail and default screener pages to static HTML and JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default=None,
+            help='Directory to write the export to (default: settings.STATIC_EXPORT_DIR)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of rendering processes (default: number of CPUs)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render every page even if its data has not changed',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir'] or settings.STATIC_EXPORT_DIR
+        os.makedirs(output_dir, exist_ok=True)
+
+        # The manifest maps each symbol to the hash its pages were rendered from
+        manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        manifest = {'stocks': {}, 'screens': None}
+        if os.path.exists(manifest_path) and not options['force']:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        data_dir = get_stock_data_dir()
+        detail_template = get_template_hash('core/stock_detail.html')
+        stock_hashes = {
+            symbol: hashlib.sha256(
+                (get_file_hash(os.path.join(data_dir, f"{symbol}.csv")) + detail_template).encode()
+            ).hexdigest()
+            for symbol in get_available_stocks()
+        }
+        changed = [
+            symbol for symbol, content_hash in stock_hashes.items()
+            if manifest['stocks'].get(symbol) != content_hash
+        ]
+        # Compare against what is actually on disk rather than the manifest,
+        # which --force discards
+        stock_dir = os.path.join(output_dir, 'stock')
+        exported = os.listdir(stock_dir) if os.path.isdir(stock_dir) else []
+        removed = sorted(symbol for symbol in exported if symbol not in stock_hashes)
+
+        # Screener pages depend on the whole universe
+        screens_hash = hashlib.sha256(
+            json.dumps([stock_hashes, get_template_hash('core/screener.html'), DEFAULT_SCREENS], sort_keys=True).encode()
+        ).hexdigest()
+        screens_changed = manifest.get('screens') != screens_hash
+
+        self.stdout.write(
+            f'{len(stock_hashes)} stocks: {len(changed)} to render, '
+            f'{len(stock_hashes) - len(changed)} unchanged, {len(removed)} removed'
+        )
+
+        for symbol in removed:
+            shutil.rmtree(os.path.join(stock_dir, symbol), ignore_errors=True)
+
+        rendered = 0
+        failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as executor:
+            futures = {
+                executor.submit(export_stock, symbol, output_dir): symbol
+                for symbol in changed
+            }
+
+            # Screener pages share one indicator snapshot, so render them
+            # here while the workers handle the detail pages
+            if screens_changed:
+                for name, filters in DEFAULT_SCREENS.items():
+                    try:
+                        export_screen(name, filters, output_dir)
+                        rendered += 1
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR(f'✗ screener/{name}: {str(e)}'))
+                        failed += 1
+                        for filename in ('index.html', 'index.json'):
+                            filepath = os.path.join(output_dir, 'screener', name, filename)
+                            if os.path.exists(filepath):
+                                os.remove(filepath)
+                        # Leave it out of the manifest so the next run retries it
+                        screens_hash = None
+
+            for future, symbol in futures.items():
+                try:
+                    future.result()
+                    rendered += 1
+                except BrokenProcessPool as e:
+                    # The pool died (e.g. a worker was OOM-killed), failing every
+                    # pending symbol: keep their last good pages, slightly stale
+                    # beats a 404, and leave them out of the manifest to retry
+                    self.stdout.write(self.style.ERROR(f'✗ {symbol}: {str(e)}'))
+                    failed += 1
+                    stock_hashes.pop(symbol)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'✗ {symbol}: {str(e)}'))
+                    failed += 1
+                    # Don't leave the previous export to be served as if current;
+                    # without a manifest entry the next run retries it
+                    shutil.rmtree(os.path.join(stock_dir, symbol), ignore_errors=True)
+                    stock_hashes.pop(symbol)
+
+        manifest = {'stocks': stock_hashes, 'screens': screens_hash}
+        write_file(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nExport complete! Rendered: {rendered}, Failed: {failed}'
+        ))
+        self.stdout.write(f'Pages saved to: {output_dir}')
@@ -0,0 +1,111 @@
+"""
+Management command to measure cold startup time of the web workers
+"""
+import json
+import os
+import subprocess
+import sys
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+# Runs in a fresh interpreter: build the WSGI app and load the URLconf
+# (which imports the views), the same work a worker does before serving.
+# Then wait for the indicator cache warm-up, if the settings enable it.
+STARTUP_SCRIPT = """
+import json, os, sys, threading, time
+start = time.perf_counter()
+os.environ['DJANGO_SETTINGS_MODULE'] = sys.argv[1]
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+ready = time.perf_counter() - start
+warmup = None
+for thread in threading.enumerate():
+    if thread.name == 'indicator-cache-warmup':
+        thread.join()
+        warmup = time.perf_counter() - start
+heavy = [name for name in ('pandas', 'numpy') if name in sys.modules]
+utils_import = None
+if 'core.utils' not in sys.modules:
+    start = time.perf_counter()
+    import core.utils
+    utils_import = time.perf_counter() - start
+print(json.dumps({'ready': ready, 'warmup': warmup, 'heavy': heavy, 'utils_import': utils_import}))
+"""
+
+DEFAULT_SETTINGS_MODULES = ['quantscase.settings', 'quantscase.settings_data']
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+class Command(BaseCommand):
+    help = 'Measure cold startup time of a worker for each settings module'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of fresh interpreters to start per settings module',
+        )
+        parser.add_argument(
+            '--settings-module',
+            action='append',
+            dest='settings_modules',
+            default=None,
+            help='Settings module to measure (can be given more than once)',
+        )
+        parser.add_argument(
+            '--no-warmup',
+            action='store_true',
+            help='Disable the indicator cache warm-up instead of measuring the configured behaviour',
+        )
+
+    def handle(self, *args, **options):
+        settings_modules = options['settings_modules'] or DEFAULT_SETTINGS_MODULES
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+        if options['no_warmup']:
+            env['STOCK_CACHE_WARMUP_ON_STARTUP'] = '0'
+
+        for settings_module in settings_modules:
+            timings = []
+            for _ in range(options['repeat']):
+                result = subprocess.run(
+                    [sys.executable, '-c', STARTUP_SCRIPT, settings_module],
+                    cwd=settings.BASE_DIR,
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                )
+                if result.returncode != 0:
+                    self.stdout.write(self.style.ERROR(f'✗ {settings_module}: {result.stderr.strip()}'))
+                    break
+                timings.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+            if not timings:
+                continue
+
+            ready = sorted(t['ready'] * 1000 for t in timings)
+            heavy = ', '.join(timings[0]['heavy']) or 'none'
+            self.stdout.write(self.style.SUCCESS(settings_module))
+            self.stdout.write(
+                f'  ready to serve: min {ready[0]:.0f} ms, '
+                f'median {_median(ready):.0f} ms, max {ready[-1]:.0f} ms'
+            )
+
+            warmups = [t['warmup'] * 1000 for t in timings if t['warmup'] is not None]
+            if warmups:
+                self.stdout.write(f'  cache warm-up finished after: median {_median(warmups):.0f} ms')
+            else:
+                self.stdout.write('  cache warm-up: off')
+            self.stdout.write(f'  heavy modules loaded by the worker: {heavy}')
+
+            utils_imports = [t['utils_import'] * 1000 for t in timings if t['utils_import'] is not None]
+            if utils_imports:
+                self.stdout.write(
+                    f'  deferred core.utils import: median {_median(utils_imports):.0f} ms'
+                )
+            else:
+                self.stdout.write('  core.utils: imported by the warm-up')
@@ -1,3 +1,313 @@
-from django.test import TestCase
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core import utils, views
+from core.management.commands.export_static import DEFAULT_SCREENS, to_json
+from quantscase import settings_data
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_stock_csv(data_dir, symbol, start_price=100.0, days=260):
+    """Write a synthetic daily price history in the format download_stock_data saves"""
+    dates = pd.date_range('2024-01-01', periods=days, freq='B')
+    close = start_price + np.arange(days) * 0.5
+    df = pd.DataFrame(
+        {'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1000},
+        index=dates,
+    )
+    df.to_csv(os.path.join(data_dir, f'{symbol}.csv'))
+
+
+def reset_snapshot():
+    utils._snapshot.update(version=None, ticket=0, indicators=None, built_at=None)
+    utils._warmup_thread = None
+    utils._last_check = None
+    utils._last_disk_load = None
+
+
+class StockDataTestCase(SimpleTestCase):
+    """Runs against a temporary stock_data dir with a few synthetic stocks"""
+
+    symbols = ['ABB', 'ACC', 'TCS']
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir, ignore_errors=True)
+        self.data_dir = os.path.join(self.base_dir, 'stock_data')
+        os.makedirs(self.data_dir)
+        for i, symbol in enumerate(self.symbols):
+            write_stock_csv(self.data_dir, symbol, start_price=100.0 * (i + 1))
+
+        settings_override = override_settings(
+            BASE_DIR=self.base_dir,
+            STOCK_SNAPSHOT_POLL_SECONDS=0,
+            STOCK_DATA_SETTLE_SECONDS=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        reset_snapshot()
+        self.addCleanup(reset_snapshot)
+
+
+class IndicatorSnapshotTests(StockDataTestCase):
+
+    def gated_build(self):
+        """Patch build_indicator_snapshot to count calls and block until the gate opens"""
+        gate = threading.Event()
+        calls = []
+        real_build = utils.build_indicator_snapshot
+
+        def build():
+            calls.append(threading.current_thread().name)
+            gate.wait(5)
+            return real_build()
+
+        patcher = mock.patch.object(utils, 'build_indicator_snapshot', side_effect=build)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(gate.set)
+        return gate, calls
+
+    def test_concurrent_cold_requests_share_one_build(self):
+        gate, calls = self.gated_build()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(utils.get_indicator_snapshot()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(sorted(results[0]), self.symbols)
+
+    def test_version_change_serves_old_snapshot_and_rebuilds_once(self):
+        old = utils.refresh_indicator_snapshot()
+        write_stock_csv(self.data_dir, 'ABB', start_price=500.0)
+        gate, calls = self.gated_build()
+
+        self.assertIs(utils.get_indicator_snapshot(), old)
+        self.assertIs(utils.get_indicator_snapshot(), old)
+        self.assertTrue(utils.get_cache_status()['stale'])
+
+        gate.set()
+        utils._warmup_thread.join(5)
+        new = utils.get_indicator_snapshot()
+
+        self.assertEqual(len(calls), 1)
+        self.assertIsNot(new, old)
+        self.assertGreater(new['ABB']['current_price'], old['ABB']['current_price'])
+        self.assertFalse(utils.get_cache_status()['stale'])
+
+    @override_settings(STOCK_DATA_SETTLE_SECONDS=3600)
+    def test_no_local_rebuild_while_data_is_changing(self):
+        old = utils.refresh_indicator_snapshot()
+        write_stock_csv(self.data_dir, 'ABB', start_price=500.0)
+
+        with mock.patch.object(utils, 'build_indicator_snapshot') as build:
+            self.assertIs(utils.get_indicator_snapshot(), old)
+        build.assert_not_called()
+        self.assertIsNone(utils._warmup_thread)
+
+    @override_settings(STOCK_DATA_SETTLE_SECONDS=3600)
+    def test_picks_up_snapshot_saved_by_download(self):
+        utils.refresh_indicator_snapshot()
+        write_stock_csv(self.data_dir, 'ABB', start_price=500.0)
+        downloaded = {'ABB': {'current_price': 1.0}}
+        utils.save_indicator_snapshot(utils.get_data_version(), downloaded)
+
+        with mock.patch.object(utils, 'build_indicator_snapshot') as build:
+            self.assertEqual(utils.get_indicator_snapshot(), downloaded)
+        build.assert_not_called()
+
+    def test_deleted_csv_drops_symbol_and_clears_stale(self):
+        old = utils.refresh_indicator_snapshot()
+        self.assertIn('TCS', old)
+        # TCS was written last, so removing it moves the newest mtime backwards
+        os.remove(os.path.join(self.data_dir, 'TCS.csv'))
+        self.assertTrue(utils.get_cache_status()['stale'])
+
+        utils.get_indicator_snapshot()
+        utils._warmup_thread.join(5)
+
+        self.assertNotIn('TCS', utils.get_indicator_snapshot())
+        self.assertFalse(utils.get_cache_status()['stale'])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_forked_child_does_not_inherit_held_build_lock(self):
+        utils.refresh_indicator_snapshot()
+        with utils._build_lock:
+            pid = os.fork()
+            if pid == 0:
+                # Child: a cold request must not block on the parent's lock
+                ok = not utils._build_lock.locked() and bool(utils.get_indicator_snapshot())
+                os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+    def test_status_is_503_until_snapshot_is_ready(self):
+        response = self.client.get('/status/')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()['ready'])
+
+        utils.refresh_indicator_snapshot()
+        response = self.client.get('/status/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['symbols'], len(self.symbols))
+
+
+class LazyImportTests(SimpleTestCase):
+
+    def test_views_and_urlconf_do_not_import_pandas(self):
+        # Fresh interpreter: this test module has already imported pandas
+        script = (
+            'import sys, django; django.setup(); '
+            'from django.urls import get_resolver; get_resolver().url_patterns; '
+            'import core.views; '
+            'print(sorted(m for m in ("pandas", "numpy") if m in sys.modules))'
+        )
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE='quantscase.settings',
+            STOCK_CACHE_WARMUP_ON_STARTUP='0',
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=REPO_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def test_health(self):
+        response = self.client.get('/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+
+class SlimDataEndpointTests(StockDataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(
+            ROOT_URLCONF=settings_data.ROOT_URLCONF,
+            MIDDLEWARE=settings_data.MIDDLEWARE,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        utils.refresh_indicator_snapshot()
+
+    def test_serves_data_endpoints(self):
+        for url in ['/screener/', '/screener/?show_all=1', '/stock/ABB/', '/status/', '/health/']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_html_pages_keep_frame_protection(self):
+        for url in ['/screener/', '/stock/ABB/']:
+            self.assertEqual(self.client.get(url)['X-Frame-Options'], 'DENY')
+
+    def test_other_routes_are_not_served(self):
+        for url in ['/', '/admin/']:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+
+# Render in threads so the workers see the test settings whether or not
+# the platform forks
+@mock.patch('core.management.commands.export_static.ProcessPoolExecutor', ThreadPoolExecutor)
+class ExportStaticTests(StockDataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = os.path.join(self.base_dir, 'export')
+
+    def export(self, **options):
+        out = StringIO()
+        call_command('export_static', output_dir=self.output_dir, workers=2, stdout=out, **options)
+        return int(re.search(r'Rendered: (\d+)', out.getvalue()).group(1))
+
+    def page(self, *parts):
+        return os.path.join(self.output_dir, *parts, 'index.html')
+
+    def test_exports_detail_and_screener_pages(self):
+        self.assertEqual(self.export(), len(self.symbols) + len(DEFAULT_SCREENS))
+        for symbol in self.symbols:
+            self.assertTrue(os.path.exists(self.page('stock', symbol)))
+            self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'stock', symbol, 'index.json')))
+        for name in DEFAULT_SCREENS:
+            self.assertTrue(os.path.exists(self.page('screener', name)))
+
+        with open(self.page('screener')) as f:
+            landing = f.read()
+        self.assertIn('href="/screener/all/"', landing)
+
+    def test_second_run_renders_nothing(self):
+        self.export()
+        self.assertEqual(self.export(), 0)
+
+    def test_changed_csv_rerenders_only_that_symbol_and_screens(self):
+        self.export()
+        unchanged_mtime = os.path.getmtime(self.page('stock', 'ACC'))
+        write_stock_csv(self.data_dir, 'ABB', start_price=500.0)
+
+        self.assertEqual(self.export(), 1 + len(DEFAULT_SCREENS))
+        self.assertEqual(os.path.getmtime(self.page('stock', 'ACC')), unchanged_mtime)
+
+    def test_removed_symbol_is_deleted_even_with_force(self):
+        self.export()
+        os.remove(os.path.join(self.data_dir, 'TCS.csv'))
+
+        self.export(force=True)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'stock', 'TCS')))
+        self.assertTrue(os.path.exists(self.page('stock', 'ABB')))
+
+    def test_failed_symbol_pages_are_removed_and_retried(self):
+        self.export()
+        write_stock_csv(self.data_dir, 'ABB', start_price=500.0)
+        real_context = views.get_stock_detail_context
+
+        def failing_context(symbol):
+            if symbol == 'ABB':
+                raise ValueError('bad data')
+            return real_context(symbol)
+
+        with mock.patch.object(views, 'get_stock_detail_context', side_effect=failing_context):
+            self.export()
+        self.assertFalse(os.path.exists(self.page('stock', 'ABB')))
+
+        self.assertEqual(self.export(), 1)
+        self.assertTrue(os.path.exists(self.page('stock', 'ABB')))
+
+    def test_broken_pool_keeps_previous_pages_and_retries(self):
+        self.export()
+        write_stock_csv(self.data_dir, 'ABB', start_price=500.0)
+
+        with mock.patch.object(views, 'get_stock_detail_context', side_effect=BrokenProcessPool('worker died')):
+            self.export()
+        self.assertTrue(os.path.exists(self.page('stock', 'ABB')))
+
+        self.assertEqual(self.export(), 1)
+
+    def test_json_has_no_nan(self):
+        data = {'rsi': float('nan'), 'points': [np.float64('inf'), 1.5], 'price': np.float64(2.5)}
+        self.assertEqual(to_json(data), '{"rsi": null, "points": [null, 1.5], "price": 2.5}')
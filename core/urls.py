@@ -1,8 +1,15 @@
 from django.urls import path
 from . import views
 
-urlpatterns = [
-    path('', views.home, name='home'),
+# Read-only data endpoints. These are also served on their own by
+# quantscase.urls_data, which runs without the admin/auth/session stack.
+data_urlpatterns = [
     path('screener/', views.screener, name='screener'),
     path('stock/<str:symbol>/', views.stock_detail, name='stock_detail'),
-]
\ No newline at end of file
+    path('status/', views.data_status, name='data_status'),
+    path('health/', views.health, name='health'),
+]
+
+urlpatterns = [
+    path('', views.home, name='home'),
+] + data_urlpatterns
@@ -2,11 +2,53 @@
 Utility functions for stock data processing and screening
 """
 import os
+import json
+import hashlib
+import itertools
+import tempfile
+import threading
+import time
 import pandas as pd
 import numpy as np
 from django.conf import settings
 from datetime import datetime, timedelta
 
+# In-process snapshot of indicators for the whole stock universe.
+# Requests always read the last complete snapshot; rebuilds happen in a
+# background thread and swap the snapshot in only once they are finished.
+_snapshot = {'version': None, 'ticket': 0, 'indicators': None, 'built_at': None}
+_snapshot_lock = threading.Lock()
+# Held for the whole of a rebuild, so only one runs per process
+_build_lock = threading.Lock()
+# Taken when a build or load starts, to order snapshots that finish out of order
+_build_counter = itertools.count(1)
+_warmup_thread = None
+_last_check = None
+# (snapshot file mtime, data version) of the last on-disk load attempt
+_last_disk_load = None
+# Process that created the locks above, see _reset_after_fork
+_lock_pid = os.getpid()
+
+def _reset_after_fork():
+    """
+    Give a forked child (e.g. under gunicorn --preload) fresh locks.
+    It inherits them in whatever state the parent's threads held them, but
+    not the threads, so a lock held by an in-flight warm-up would never be
+    released. The inherited snapshot itself is still valid and is kept.
+    Safe to call more than once per process.
+    """
+    global _snapshot_lock, _build_lock, _warmup_thread, _lock_pid
+    
+    if _lock_pid == os.getpid():
+        return
+    _lock_pid = os.getpid()
+    _snapshot_lock = threading.Lock()
+    _build_lock = threading.Lock()
+    _warmup_thread = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 def get_stock_data_dir():
     """Get the stock data directory path"""
     return os.path.join(settings.BASE_DIR, 'stock_data')
@@ -143,16 +185,43 @@ def calculate_indicators(df):
         print(f"Error calculating indicators: {e}")
         return None
 
-def screen_stocks(filters):
+def get_snapshot_path():
+    """Get the path of the on-disk indicator snapshot"""
+    return os.path.join(get_stock_data_dir(), '.indicators_snapshot.json')
+
+def _scan_data_files():
     """
-    Screen stocks based on filters
-    filters: dict with keys like min_price, max_price, min_pct_1m, max_rsi, etc.
-    Returns list of stock symbols that match the criteria
+    Fingerprint the downloaded CSV files (names, sizes and mtimes).
+    Returns (version, latest_mtime_ns); both are None if there is no data dir.
     """
-    available_stocks = get_available_stocks()
-    matched_stocks = []
+    data_dir = get_stock_data_dir()
+    if not os.path.exists(data_dir):
+        return None, None
+    
+    digest = hashlib.sha1()
+    latest_mtime = 0
+    for entry in sorted(os.scandir(data_dir), key=lambda e: e.name):
+        if entry.name.endswith('.csv'):
+            stat = entry.stat()
+            digest.update(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            latest_mtime = max(latest_mtime, stat.st_mtime_ns)
+    return digest.hexdigest(), latest_mtime
+
+def get_data_version():
+    """
+    Fingerprint of the downloaded CSV files.
+    Changes whenever download_stock_data rewrites the data.
+    """
+    return _scan_data_files()[0]
+
+def build_indicator_snapshot():
+    """
+    Load every available stock and calculate its indicators
+    Returns {symbol: indicators}
+    """
+    indicators_by_symbol = {}
     
-    for symbol in available_stocks:
+    for symbol in get_available_stocks():
         df = load_stock_data(symbol)
         if df is None:
             continue
@@ -161,6 +230,194 @@ def screen_stocks(filters):
         if indicators is None:
             continue
         
+        indicators_by_symbol[symbol] = indicators
+    
+    return indicators_by_symbol
+
+def save_indicator_snapshot(version, indicators_by_symbol):
+    """Write a snapshot to disk so other processes can load it without recomputing"""
+    filepath = get_snapshot_path()
+    tmp = None
+    try:
+        # Unique temp file: several workers and download_stock_data may save at once
+        with tempfile.NamedTemporaryFile(
+            'w', dir=os.path.dirname(filepath), prefix='.indicators_snapshot.',
+            suffix='.tmp', delete=False,
+        ) as tmp:
+            json.dump({'version': version, 'indicators': indicators_by_symbol}, tmp, default=float)
+        os.replace(tmp.name, filepath)
+    except Exception as e:
+        print(f"Error saving indicator snapshot: {e}")
+        if tmp is not None and os.path.exists(tmp.name):
+            os.remove(tmp.name)
+
+def load_indicator_snapshot(version):
+    """Load the on-disk snapshot if it matches the given data version"""
+    filepath = get_snapshot_path()
+    if not os.path.exists(filepath):
+        return None
+    
+    try:
+        with open(filepath) as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Error loading indicator snapshot: {e}")
+        return None
+    
+    if data.get('version') != version:
+        return None
+    return data.get('indicators')
+
+def _swap_snapshot(version, ticket, indicators_by_symbol):
+    """
+    Install a finished snapshot. One matching the current data always beats
+    one that doesn't; otherwise the one whose build started last wins.
+    Returns the snapshot that is current afterwards.
+    """
+    data_version = get_data_version()
+    with _snapshot_lock:
+        current_matches = _snapshot['indicators'] is not None and _snapshot['version'] == data_version
+        new_matches = version == data_version
+        if (
+            _snapshot['indicators'] is None
+            or (new_matches and not current_matches)
+            or (new_matches == current_matches and ticket > _snapshot['ticket'])
+        ):
+            _snapshot['version'] = version
+            _snapshot['ticket'] = ticket
+            _snapshot['indicators'] = indicators_by_symbol
+            _snapshot['built_at'] = datetime.now()
+        return _snapshot['indicators']
+
+def refresh_indicator_snapshot():
+    """
+    Bring the in-process snapshot up to date with the data on disk.
+    Uses the on-disk snapshot when it is current, otherwise recomputes
+    everything and persists the result. Only one refresh runs at a time;
+    concurrent callers wait for it and then reuse its result.
+    """
+    with _build_lock:
+        ticket = next(_build_counter)
+        version = get_data_version()
+        with _snapshot_lock:
+            if _snapshot['indicators'] is not None and _snapshot['version'] == version:
+                return _snapshot['indicators']
+        
+        indicators_by_symbol = load_indicator_snapshot(version)
+        if indicators_by_symbol is None:
+            indicators_by_symbol = build_indicator_snapshot()
+            save_indicator_snapshot(version, indicators_by_symbol)
+        
+        return _swap_snapshot(version, ticket, indicators_by_symbol)
+
+def warm_indicator_cache(background=True):
+    """
+    Precompute the indicator snapshot.
+    With background=True the work runs in a daemon thread and this returns
+    immediately; a warm-up that is already running is not started twice.
+    """
+    global _warmup_thread
+    
+    if not background:
+        return refresh_indicator_snapshot()
+    
+    with _snapshot_lock:
+        if _warmup_thread is not None and _warmup_thread.is_alive():
+            return None
+        _warmup_thread = threading.Thread(
+            target=refresh_indicator_snapshot,
+            name='indicator-cache-warmup',
+            daemon=True,
+        )
+        _warmup_thread.start()
+    return None
+
+def _check_for_new_data():
+    """
+    Pick up new data without recomputing in the request path.
+    A snapshot saved by download_stock_data is swapped in as soon as it
+    appears. A local rebuild only starts once the CSVs have stopped changing
+    for STOCK_DATA_SETTLE_SECONDS and no such snapshot has shown up.
+    """
+    global _last_check, _last_disk_load
+    
+    poll_seconds = getattr(settings, 'STOCK_SNAPSHOT_POLL_SECONDS', 5)
+    settle_seconds = getattr(settings, 'STOCK_DATA_SETTLE_SECONDS', 120)
+    
+    now = time.monotonic()
+    with _snapshot_lock:
+        if _last_check is not None and now - _last_check < poll_seconds:
+            return
+        _last_check = now
+        current_version = _snapshot['version']
+    
+    version, data_mtime = _scan_data_files()
+    if version == current_version:
+        return
+    
+    # Only re-read the on-disk snapshot when it or the data has changed
+    # since the last attempt; while a download runs it usually has not
+    try:
+        disk_mtime = os.stat(get_snapshot_path()).st_mtime_ns
+    except OSError:
+        disk_mtime = None
+    if disk_mtime is not None and (disk_mtime, version) != _last_disk_load:
+        _last_disk_load = (disk_mtime, version)
+        ticket = next(_build_counter)
+        indicators_by_symbol = load_indicator_snapshot(version)
+        if indicators_by_symbol is not None:
+            _swap_snapshot(version, ticket, indicators_by_symbol)
+            return
+    
+    if data_mtime is not None and time.time() - data_mtime / 1e9 >= settle_seconds:
+        warm_indicator_cache(background=True)
+
+def get_indicator_snapshot():
+    """
+    Get {symbol: indicators} for the whole universe.
+    If the data changed since the last snapshot, the previous snapshot is
+    served until a new one is available (see _check_for_new_data). Only a
+    cold process with no snapshot at all waits for one to be built.
+    """
+    with _snapshot_lock:
+        indicators_by_symbol = _snapshot['indicators']
+    
+    if indicators_by_symbol is None:
+        # Joins an in-flight build (e.g. the startup warm-up) if there is one
+        return refresh_indicator_snapshot()
+    
+    _check_for_new_data()
+    with _snapshot_lock:
+        return _snapshot['indicators']
+
+def get_cache_status():
+    """Readiness of the indicator snapshot, for health checks"""
+    with _snapshot_lock:
+        version = _snapshot['version']
+        built_at = _snapshot['built_at']
+        count = len(_snapshot['indicators']) if _snapshot['indicators'] is not None else 0
+    
+    return {
+        'ready': built_at is not None,
+        'warming': _build_lock.locked(),
+        'stale': built_at is not None and version != get_data_version(),
+        'version': version,
+        'built_at': built_at.isoformat() if built_at else None,
+        'symbols': count,
+    }
+
+def screen_stocks(filters):
+    """
+    Screen stocks based on filters
+    filters: dict with keys like min_price, max_price, min_pct_1m, max_rsi, etc.
+    Returns list of stock symbols that match the criteria
+    """
+    indicators_by_symbol = get_indicator_snapshot()
+    matched_stocks = []
+    
+    for symbol in sorted(indicators_by_symbol):
+        indicators = indicators_by_symbol[symbol]
+        
         # Apply filters
         match = True
         
@@ -1,17 +1,50 @@
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
-from .utils import screen_stocks, get_available_stocks, load_stock_data, calculate_indicators
+
+# core.utils pulls in pandas and numpy, so it is imported inside the data
+# views only; home and health checks never pay that import cost.
 
 def home(request):
     return render(request, 'core/home.html')
 
+def health(request):
+    """Liveness check that does not touch the stock data"""
+    return JsonResponse({'status': 'ok'})
+
+def get_screener_context(filters=None, show_all=False):
+    """
+    Build the screener template context.
+    With filters: only matching stocks. With show_all and no filters: every stock.
+    """
+    from .utils import screen_stocks, get_available_stocks
+
+    results = []
+    total_stocks = len(get_available_stocks())
+
+    if filters:
+        results = screen_stocks(filters)
+    elif show_all and total_stocks > 0:
+        # No filters: show all stocks (so user can see full universe)
+        results = screen_stocks({})
+
+    # Sort by 1M return (descending)
+    if results:
+        results.sort(key=lambda x: x['indicators']['pct_1m'] or -999, reverse=True)
+
+    return {
+        'results': results,
+        'filters': filters or {},
+        'total_stocks': total_stocks,
+        'results_count': len(results),
+        'show_all': show_all,
+    }
+
 def screener(request):
     """
     Stock screener view with filtering capabilities.
     With no filters: shows all stocks. With filters: shows only matching stocks.
     """
-    results = []
     filters = {}
-    total_stocks = len(get_available_stocks())
     has_filters = request.method == 'GET' and any(
         request.GET.get(key)
         for key in [
@@ -41,29 +74,18 @@ def screener(request):
             'above_ma_50': request.GET.get('above_ma_50') == 'on',
             'above_ma_200': request.GET.get('above_ma_200') == 'on',
         }
-        results = screen_stocks(filters)
-    elif show_all and total_stocks > 0:
-        # No filters: show all stocks (so user can see full universe)
-        results = screen_stocks({})
 
-    # Sort by 1M return (descending)
-    if results:
-        results.sort(key=lambda x: x['indicators']['pct_1m'] or -999, reverse=True)
-
-    context = {
-        'results': results,
-        'filters': filters,
-        'total_stocks': total_stocks,
-        'results_count': len(results),
-        'show_all': show_all,
-    }
+    context = get_screener_context(filters, show_all)
     return render(request, 'core/screener.html', context)
 
 
-def stock_detail(request, symbol):
+def get_stock_detail_context(symbol):
     """
-    Detailed view for a single stock with price/indicator visualizations.
+    Build the stock detail template context for a symbol.
+    The returned 'symbol' is normalized to the one found in the dataset.
     """
+    from .utils import get_available_stocks, load_stock_data, calculate_indicators
+
     # Ensure the symbol exists in our downloaded dataset
     available = get_available_stocks()
     if symbol not in available:
@@ -71,14 +93,10 @@ def stock_detail(request, symbol):
         symbol_normalized = symbol.upper()
         if symbol_normalized not in available:
             # Use a simple 404-style page
-            return render(
-                request,
-                'core/stock_detail.html',
-                {
-                    'symbol': symbol,
-                    'error': 'No data found for this symbol. Please make sure data is downloaded.',
-                },
-            )
+            return {
+                'symbol': symbol,
+                'error': 'No data found for this symbol. Please make sure data is downloaded.',
+            }
         symbol = symbol_normalized
 
     df = load_stock_data(symbol)
@@ -109,11 +127,28 @@ def stock_detail(request, symbol):
                 }
             )
 
-    context = {
+    return {
         'symbol': symbol,
         'indicators': indicators,
         'chart_data': chart_data,
         'error': None if chart_data else 'No historical data available to plot.',
     }
 
+
+def stock_detail(request, symbol):
+    """
+    Detailed view for a single stock with price/indicator visualizations.
+    """
+    context = get_stock_detail_context(symbol)
     return render(request, 'core/stock_detail.html', context)
+
+
+def data_status(request):
+    """
+    Readiness of the screener's indicator snapshot.
+    Returns 503 until the first snapshot has been built.
+    """
+    from .utils import get_cache_status
+
+    status = get_cache_status()
+    return JsonResponse(status, status=200 if status['ready'] else 503)
@@ -119,3 +119,20 @@ STATIC_URL = '/static/'
 
 import os
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+# Precompute the screener's indicator snapshot in the background when a
+# server process starts, so the first request after a deploy is not cold.
+# The pandas/numpy import happens on the warm-up thread, off the startup
+# path, but it does load them in every worker. Set the environment variable
+# to 0 for workers that never serve the screener (see settings_data).
+STOCK_CACHE_WARMUP_ON_STARTUP = os.environ.get('STOCK_CACHE_WARMUP_ON_STARTUP', '1') != '0'
+
+# How often a worker checks whether the CSVs changed, and how long they must
+# stay unchanged before it rebuilds the snapshot itself. Until then it keeps
+# serving the old snapshot and waits for the one download_stock_data saves.
+STOCK_SNAPSHOT_POLL_SECONDS = 5
+STOCK_DATA_SETTLE_SECONDS = 120
+
+# Output directory of the export_static management command. Serve it from a
+# CDN or nginx in front of Django.
+STATIC_EXPORT_DIR = os.path.join(BASE_DIR, 'static_export')
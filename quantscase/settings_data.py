@@ -0,0 +1,47 @@
+"""
+Django settings for workers that only serve the read-only data endpoints.
+
+Extends quantscase.settings but drops the admin, auth, sessions and
+messages apps and their middleware, and CSRF, none of which the GET-only
+screener needs. The default deployment (quantscase.wsgi) keeps serving
+everything; this is an optional split: run a second pool of workers with
+quantscase.wsgi_data (or DJANGO_SETTINGS_MODULE=quantscase.settings_data)
+and route /screener/, /stock/, /status/ and /health/ to them, e.g. in nginx:
+
+    location ~ ^/(screener|stock|status|health)/ {
+        proxy_pass http://data_workers;
+    }
+
+The main pool can then run with STOCK_CACHE_WARMUP_ON_STARTUP=0 so it never
+loads pandas.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    "django.contrib.staticfiles",
+    "core",
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "quantscase.urls_data"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+            ],
+        },
+    },
+]
+
+AUTH_PASSWORD_VALIDATORS = []
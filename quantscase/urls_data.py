@@ -0,0 +1,14 @@
+"""
+Slim URL configuration for the read-only data endpoints.
+
+Used by quantscase.settings_data: only the screener, stock detail, status
+and health routes, with no admin site.
+"""
+
+from django.urls import path, include
+
+from core.urls import data_urlpatterns
+
+urlpatterns = [
+    path("", include(data_urlpatterns)),
+]
@@ -0,0 +1,14 @@
+"""
+WSGI config for the read-only data endpoints.
+
+Same as quantscase.wsgi but defaults to the slim quantscase.settings_data,
+so these workers start without the admin, auth, sessions and messages stack.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "quantscase.settings_data")
+
+application = get_wsgi_application()